@@ -1,22 +1,122 @@
-from flask import Flask, render_template, request, jsonify
-from datetime import datetime, timedelta
+from flask import Flask, Response, request, jsonify, g, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from datetime import datetime, date, timedelta
 import sqlite3
 import os
+import sys
+import threading
+import time
 import urllib.parse
-import random
-import string
+import secrets
+import hashlib
+import gzip
+from functools import lru_cache
+from flask_compress import Compress
+import orjson
+
+from database import PoolConexoes
+
+try:
+    import brotli  # já instalado como dependência do Flask-Compress
+except ImportError:
+    brotli = None
+
+# O servidor do Flask é só para desenvolvimento; em produção o processo é
+# substituído pelo Gunicorn, que lê gunicorn.conf.py do diretório atual. A
+# troca vem antes de qualquer inicialização: o Gunicorn importa o app de novo
+if __name__ == '__main__' and '--dev' not in sys.argv:
+    try:
+        os.execvp('gunicorn', ['gunicorn', 'app:app'])
+    except FileNotFoundError:
+        sys.exit('Gunicorn não encontrado: instale as dependências ou use '
+                 '"python app.py --dev" para o servidor de desenvolvimento.')
 
-app = Flask(__name__)
 
-# Configuração do banco de dados
-DATABASE = 'barbearia.db'
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialização JSON do Flask (jsonify) feita pelo orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Arquivos estáticos (inclusive a página principal) podem ficar 1h em cache
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600
+
+# Compressão br/gzip das respostas JSON (a partir de 500 bytes); a página
+# principal já é servida comprimida por index()
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 6
+# O Flask-Compress 1.14 comprime um stream lendo o corpo inteiro com
+# get_data(): /agendamentos segue em streaming, sem compressão
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+# Configuração do banco de dados (os testes apontam para um arquivo temporário)
+DATABASE = os.environ.get('BARBEARIA_DB', 'barbearia.db')
+
+# Serviços oferecidos: código -> (nome, valor, duração)
+SERVICOS = {
+    'corte': ('Corte Social', 45.00, '30min'),
+    'kids': ('Corte Kids', 35.00, '25min'),
+    'combo': ('Cabelo e Barba', 70.00, '50min'),
+    'degrade': ('Degradê Giletado', 60.00, '40min')
+}
+
+# Consultas das rotas, definidas uma vez: o texto idêntico garante acerto no
+# cache de statements preparados de cada conexão
+SQL_DISPONIBILIDADE = '''
+    SELECT data, horario FROM horarios_disponiveis
+    WHERE data >= ? AND disponivel = TRUE
+    ORDER BY data, horario
+'''
+
+SQL_RESERVAR_HORARIO = '''
+    UPDATE horarios_disponiveis
+    SET disponivel = FALSE
+    WHERE data = ? AND horario = ? AND disponivel = TRUE
+'''
+
+SQL_INSERIR_AGENDAMENTO = '''
+    INSERT INTO agendamentos (nome, telefone, servico, data, horario)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+SQL_LISTAR_AGENDAMENTOS = '''
+    SELECT * FROM agendamentos
+    ORDER BY data, horario
+'''
+
+# WhatsApp da barbearia: prefixos fixos dos links, só a mensagem é codificada
+TELEFONE_WHATSAPP = '5516997455195'
+WHATSAPP_MOBILE = f"https://wa.me/{TELEFONE_WHATSAPP}?text="
+WHATSAPP_DESKTOP = f"https://web.whatsapp.com/send?phone={TELEFONE_WHATSAPP}&text="
+
+
+# init_db roda ao importar o módulo; o comando init-db, que importa o app,
+# não precisa repetir o trabalho no mesmo processo
+_banco_inicializado = False
 
 
 def init_db():
-    """Inicializa o banco de dados"""
+    """Inicializa o banco de dados (uma vez por processo)"""
+    global _banco_inicializado
+    if _banco_inicializado:
+        return
+
     conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
 
+    # WAL é persistente no arquivo: leitores de /horarios não bloqueiam as
+    # escritas de /agendar e cada commit faz menos fsync
+    cursor.execute('PRAGMA journal_mode=WAL')
+
     # Tabela de agendamentos
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS agendamentos (
@@ -41,109 +141,251 @@ def init_db():
         )
     ''')
 
+    # Índices que cobrem as consultas de /horarios e /agendamentos
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_horarios_data_disp
+        ON horarios_disponiveis (data, disponivel, horario)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_agendamentos_data_horario
+        ON agendamentos (data, horario)
+    ''')
+
     conn.commit()
+
+    # Estatísticas para o planejador escolher os índices acima: ANALYZE
+    # completo só no primeiro boot; depois o PRAGMA optimize reanalisa
+    # apenas o que mudou, como no database.py
+    tem_estatisticas = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()
+    cursor.execute('PRAGMA optimize' if tem_estatisticas else 'ANALYZE')
     conn.close()
+    _banco_inicializado = True
 
 
 def get_db_connection():
     """Cria conexão com o banco de dados"""
-    conn = sqlite3.connect(DATABASE)
+    # timeout: escritores concorrentes aguardam o lock por até 5s em vez de falhar
+    conn = sqlite3.connect(DATABASE, timeout=5.0, check_same_thread=False, cached_statements=128)
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=134217728')
+    conn.execute('PRAGMA cache_size=-20000')
     return conn
 
 
+# O mesmo pool do database.py: validação na retirada e espera limitada
+pool = PoolConexoes(get_db_connection, tamanho=8, espera=30)
+
+
+def get_db():
+    """Retorna a conexão do pool associada ao contexto atual"""
+    if 'db' not in g:
+        g.db = pool.pegar()
+    return g.db
+
+
+@app.teardown_appcontext
+def devolver_conexao(exc):
+    """Devolve ao pool a conexão usada no contexto"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        pool.devolver(conn)
+
+
+SEM_HORARIOS_JSON = b'[]'
+
+
+class MapaDisponibilidade:
+    """Horários livres por data mantidos em memória do processo
+
+    O mapa inteiro é carregado com uma consulta e recarregado quando passa da
+    validade, para refletir reservas feitas por outros workers.
+    """
+
+    def __init__(self, validade=60):
+        self._validade = validade
+        self._horarios = {}
+        self._json = {}  # data -> lista já serializada
+        self._carregado_em = None
+        self._lock = threading.Lock()
+
+    def _carregar(self):
+        # Tuplas simples, sem o custo do sqlite3.Row; já vêm ordenadas
+        cursor = get_db().cursor()
+        cursor.row_factory = None
+
+        horarios = {}
+        for data, horario in cursor.execute(SQL_DISPONIBILIDADE, (data_de_hoje().isoformat(),)):
+            horarios.setdefault(data, []).append(horario)
+
+        self._horarios = horarios
+        self._json = {}
+        self._carregado_em = time.monotonic()
+
+    def _recarregar_se_vencido(self):
+        if self._carregado_em is None or time.monotonic() - self._carregado_em > self._validade:
+            self._carregar()
+
+    def horarios(self, data):
+        """Retorna a lista ordenada de horários livres da data"""
+        with self._lock:
+            self._recarregar_se_vencido()
+            return self._horarios.get(data, [])
+
+    def horarios_json(self, data):
+        """Mesma lista de horarios(), já em bytes JSON, serializada uma vez por versão"""
+        with self._lock:
+            self._recarregar_se_vencido()
+            livres = self._horarios.get(data)
+            if livres is None:
+                # Só datas do mapa entram no cache: as demais vêm do cliente
+                return SEM_HORARIOS_JSON
+            corpo = self._json.get(data)
+            if corpo is None:
+                corpo = self._json[data] = orjson.dumps(livres)
+            return corpo
+
+    def reservar(self, data, horario):
+        """Remove do mapa um horário que acabou de ser reservado"""
+        with self._lock:
+            livres = self._horarios.get(data)
+            if livres and horario in livres:
+                # Nova lista: quem já leu a anterior continua com uma cópia estável
+                self._horarios[data] = [h for h in livres if h != horario]
+                self._json.pop(data, None)
+
+
+disponibilidade = MapaDisponibilidade()
+
+# Grade de horários de funcionamento, montada uma única vez
+HORARIOS_SEMANA = (
+    '08:00', '08:30', '09:00', '09:30', '10:00', '10:30',
+    '11:00', '11:30', '14:00', '14:30', '15:00', '15:30',
+    '16:00', '16:30', '17:00', '17:30', '18:00', '18:30'
+)
+
+# Sábado tem horário reduzido
+HORARIOS_SABADO = tuple(h for h in HORARIOS_SEMANA if h <= '12:30')
+
+
 def popular_horarios_disponiveis():
     """Popula a tabela de horários disponíveis"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Horários de funcionamento
-    horarios_base = [
-        '08:00', '08:30', '09:00', '09:30', '10:00', '10:30',
-        '11:00', '11:30', '14:00', '14:30', '15:00', '15:30',
-        '16:00', '16:30', '17:00', '17:30', '18:00', '18:30'
+    conn = get_db()
+
+    # Popular horários para os próximos 30 dias (domingo fechado)
+    hoje = data_de_hoje()
+    dias = [hoje + timedelta(days=i) for i in range(30)]
+    linhas = [
+        (data.isoformat(), horario)
+        for data in dias if data.weekday() != 6
+        for horario in (HORARIOS_SABADO if data.weekday() == 5 else HORARIOS_SEMANA)
     ]
 
-    # Popular horários para os próximos 30 dias
-    hoje = datetime.now().date()
-    for i in range(30):
-        data = hoje + timedelta(days=i)
-        data_str = data.isoformat()
+    # Uma única transação para todas as linhas
+    with conn:
+        conn.executemany('''
+            INSERT OR IGNORE INTO horarios_disponiveis (data, horario, disponivel)
+            VALUES (?, ?, 1)
+        ''', linhas)
 
-        # Verificar se é domingo (fechado)
-        if data.weekday() == 6:  # Domingo
-            continue
 
-        # Sábado tem horário reduzido
-        horarios_do_dia = horarios_base.copy()
-        if data.weekday() == 5:  # Sábado
-            horarios_do_dia = [h for h in horarios_do_dia if int(h.split(':')[0]) <= 12]
+def janela_populada():
+    """Verifica se os horários já estão populados até o fim da janela de 30 dias"""
+    ultimo_dia = data_de_hoje() + timedelta(days=29)
+    if ultimo_dia.weekday() == 6:  # Domingo não tem horários
+        ultimo_dia -= timedelta(days=1)
 
-        for horario in horarios_do_dia:
-            cursor.execute('''
-                INSERT OR IGNORE INTO horarios_disponiveis (data, horario, disponivel)
-                VALUES (?, ?, ?)
-            ''', (data_str, horario, True))
+    try:
+        resultado = get_db().execute(
+            'SELECT 1 FROM horarios_disponiveis WHERE data = ? LIMIT 1',
+            (ultimo_dia.isoformat(),)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return False
 
-    conn.commit()
-    conn.close()
+    return resultado is not None
+
+
+@lru_cache(maxsize=1)
+def _data_do_minuto(minuto):
+    return date.today()
+
+
+def data_de_hoje():
+    """Data atual, recalculada no máximo uma vez por minuto"""
+    return _data_do_minuto(int(time.time()) // 60)
 
 
 def gerar_numero_confirmacao():
     """Gera um número de confirmação no formato BS + Data + Hora + Random"""
-    agora = datetime.now()
-    data_str = agora.strftime("%d%m%y")  # DDMMYY
-    hora_str = agora.strftime("%H%M%S")  # HHMMSS
-    random_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-    return f"BS{data_str}{hora_str}{random_chars}"
+    return f"BS{datetime.now():%d%m%y%H%M%S}{secrets.token_hex(2).upper()}"  # DDMMYYHHMMSS
+
+
+def ler_data(data_str):
+    """Converte uma data YYYY-MM-DD; outros formatos ISO lançam ValueError"""
+    # No Python 3.11+ o fromisoformat também aceita 20261015 e 2026-W42-3
+    data = date.fromisoformat(data_str)
+    if data.isoformat() != data_str:
+        raise ValueError(f'Data fora do formato YYYY-MM-DD: {data_str}')
+    return data
 
 
 def formatar_data_brasileira(data_str):
     """Formata data de YYYY-MM-DD para DD/MM/YYYY"""
     try:
-        data_obj = datetime.strptime(data_str, '%Y-%m-%d')
-        return data_obj.strftime('%d/%m/%Y')
+        return date.fromisoformat(data_str).strftime('%d/%m/%Y')
     except ValueError:
         return data_str
 
 
-def obter_valor_servico(servico):
-    """Retorna o valor do serviço"""
-    valores = {
-        'corte': 45.00,
-        'kids': 35.00,
-        'combo': 70.00,
-        'degrade': 60.00
-    }
-    return valores.get(servico, 0.00)
-
-
-def obter_duracao_servico(servico):
-    """Retorna a duração do serviço"""
-    duracoes = {
-        'corte': '30min',
-        'kids': '25min',
-        'combo': '50min',
-        'degrade': '40min'
-    }
-    return duracoes.get(servico, '')
-
-
-def obter_nome_servico(servico):
-    """Retorna o nome formatado do serviço"""
-    servicos_nomes = {
-        'corte': 'Corte Social',
-        'kids': 'Corte Kids',
-        'combo': 'Cabelo e Barba',
-        'degrade': 'Degradê Giletado'
-    }
-    return servicos_nomes.get(servico, servico)
+def obter_servico(servico):
+    """Retorna (nome, valor, duração) do serviço"""
+    return SERVICOS.get(servico, (servico, 0.00, ''))
 
 
 @app.route('/')
 def index():
     """Página principal"""
-    return render_template('index.html')
+    versoes = _pagina_inicial()
+    codificacao = next(
+        (c for c in ('br', 'gzip') if c in versoes and c in request.accept_encodings),
+        'identity'
+    )
+    corpo, etag = versoes[codificacao]
+
+    resposta = Response(corpo, mimetype='text/html')
+    if codificacao != 'identity':
+        resposta.headers['Content-Encoding'] = codificacao
+    resposta.vary.add('Accept-Encoding')
+    resposta.set_etag(etag)
+    resposta.cache_control.public = True
+    resposta.cache_control.max_age = app.config['SEND_FILE_MAX_AGE_DEFAULT']
+    # Responde 304 quando o navegador já tem esta versão
+    return resposta.make_conditional(request)
+
+
+@lru_cache(maxsize=1)
+def _pagina_inicial():
+    """Lê o HTML estático uma única vez por processo e o comprime em cada codificação
+
+    Retorna codificação -> (corpo, ETag). Comprimir aqui, e não no Flask-Compress,
+    faz o make_conditional de index() comparar o mesmo ETag que o cliente recebeu.
+    """
+    with open(os.path.join(app.static_folder, 'index.html'), 'rb') as f:
+        corpo = f.read()
+    etag = hashlib.sha1(corpo).hexdigest()
+
+    # Uma vez por processo: vale o nível máximo de compressão
+    versoes = {
+        'identity': (corpo, etag),
+        'gzip': (gzip.compress(corpo, 9), f'{etag}:gzip'),
+    }
+    if brotli is not None:
+        versoes['br'] = (brotli.compress(corpo), f'{etag}:br')
+    return versoes
 
 
 @app.route('/horarios')
@@ -156,24 +398,11 @@ def get_horarios():
 
     try:
         # Validar formato da data
-        datetime.strptime(data, '%Y-%m-%d')
+        ler_data(data)
     except ValueError:
         return jsonify({'error': 'Formato de data inválido'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Buscar horários disponíveis para a data
-    cursor.execute('''
-        SELECT horario FROM horarios_disponiveis 
-        WHERE data = ? AND disponivel = TRUE
-        ORDER BY horario
-    ''', (data,))
-
-    horarios = [row['horario'] for row in cursor.fetchall()]
-    conn.close()
-
-    return jsonify(horarios)
+    return Response(disponibilidade.horarios_json(data), mimetype='application/json')
 
 
 @app.route('/agendar', methods=['POST'])
@@ -199,7 +428,7 @@ def agendar():
 
         # Validar formato da data
         try:
-            datetime.strptime(data_agendamento, '%Y-%m-%d')
+            data_obj = ler_data(data_agendamento)
         except ValueError:
             return jsonify({
                 'success': False,
@@ -207,9 +436,7 @@ def agendar():
             }), 400
 
         # Validar se a data não é no passado
-        hoje = datetime.now().date()
-        data_obj = datetime.strptime(data_agendamento, '%Y-%m-%d').date()
-        if data_obj < hoje:
+        if data_obj < data_de_hoje():
             return jsonify({
                 'success': False,
                 'message': 'Não é possível agendar para datas passadas'
@@ -222,18 +449,15 @@ def agendar():
                 'message': 'A barbearia não funciona aos domingos'
             }), 400
 
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
 
-        # Verificar se o horário ainda está disponível
-        cursor.execute('''
-            SELECT disponivel FROM horarios_disponiveis 
-            WHERE data = ? AND horario = ?
-        ''', (data_agendamento, horario))
+        # Reservar o horário: só altera a linha se ainda estiver disponível,
+        # então duas requisições simultâneas não reservam o mesmo horário
+        cursor.execute(SQL_RESERVAR_HORARIO, (data_agendamento, horario))
 
-        resultado = cursor.fetchone()
-        if not resultado or not resultado['disponivel']:
-            conn.close()
+        if cursor.rowcount != 1:
+            conn.rollback()
             return jsonify({
                 'success': False,
                 'message': 'Horário indisponível. Por favor, selecione outro horário.'
@@ -243,28 +467,18 @@ def agendar():
         numero_confirmacao = gerar_numero_confirmacao()
 
         # Inserir agendamento
-        cursor.execute('''
-            INSERT INTO agendamentos (nome, telefone, servico, data, horario)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (nome, telefone, servico, data_agendamento, horario))
-
-        # Marcar horário como indisponível
-        cursor.execute('''
-            UPDATE horarios_disponiveis 
-            SET disponivel = FALSE 
-            WHERE data = ? AND horario = ?
-        ''', (data_agendamento, horario))
+        cursor.execute(SQL_INSERIR_AGENDAMENTO, (nome, telefone, servico, data_agendamento, horario))
 
         conn.commit()
 
+        # A disponibilidade da data mudou
+        disponibilidade.reservar(data_agendamento, horario)
+
         # Buscar o ID do agendamento criado
         agendamento_id = cursor.lastrowid
-        conn.close()
 
         # Preparar dados para a mensagem
-        nome_servico = obter_nome_servico(servico)
-        valor_servico = obter_valor_servico(servico)
-        duracao_servico = obter_duracao_servico(servico)
+        nome_servico, valor_servico, duracao_servico = obter_servico(servico)
         data_formatada = formatar_data_brasileira(data_agendamento)
 
         # MENSAGEM PROFISSIONAL
@@ -290,17 +504,17 @@ Obrigado pela preferência! 💈"""
         mensagem_simples = f"Agendamento GUELFI-Barber: {nome} - {nome_servico} - {data_formatada} - {horario} - Código: {numero_confirmacao}"
 
         # Codificação para WhatsApp
-        mensagem_codificada = urllib.parse.quote(mensagem_profissional)
-        mensagem_simples_codificada = urllib.parse.quote(mensagem_simples)
+        mensagem_codificada = urllib.parse.quote(mensagem_profissional, safe='*')
+        mensagem_simples_codificada = urllib.parse.quote(mensagem_simples, safe='*')
 
         # Links otimizados para WhatsApp
         whatsapp_links = {
             # Para mobile - mensagem profissional
-            'mobile_profissional': f"https://wa.me/5516997455195?text={mensagem_codificada}",
+            'mobile_profissional': WHATSAPP_MOBILE + mensagem_codificada,
             # Para mobile - mensagem simples (fallback)
-            'mobile_simples': f"https://wa.me/5516997455195?text={mensagem_simples_codificada}",
+            'mobile_simples': WHATSAPP_MOBILE + mensagem_simples_codificada,
             # Fallback para desktop
-            'desktop': f"https://web.whatsapp.com/send?phone=5516997455195&text={mensagem_codificada}"
+            'desktop': WHATSAPP_DESKTOP + mensagem_codificada
         }
 
         return jsonify({
@@ -309,7 +523,7 @@ Obrigado pela preferência! 💈"""
             'whatsapp_links': whatsapp_links,
             'mensagem_direct': mensagem_profissional,
             'mensagem_simples': mensagem_simples,
-            'telefone_whatsapp': '5516997455195',
+            'telefone_whatsapp': TELEFONE_WHATSAPP,
             'agendamento_id': agendamento_id,
             'detalhes_agendamento': {
                 'nome': nome,
@@ -334,18 +548,22 @@ Obrigado pela preferência! 💈"""
 @app.route('/agendamentos')
 def listar_agendamentos():
     """Lista todos os agendamentos (para administração)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    def gerar_json():
+        # Envia cada linha assim que o SQLite a retorna, sem montar a lista inteira
+        # Tuplas simples e nomes das colunas lidos uma única vez
+        cursor = get_db().cursor()
+        cursor.row_factory = None
+        cursor.execute(SQL_LISTAR_AGENDAMENTOS)
+        colunas = [descricao[0] for descricao in cursor.description]
 
-    cursor.execute('''
-        SELECT * FROM agendamentos 
-        ORDER BY data, horario
-    ''')
+        yield b'['
+        separador = b''
+        for row in cursor:
+            yield separador + orjson.dumps(dict(zip(colunas, row)))
+            separador = b','
+        yield b']'
 
-    agendamentos = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-
-    return jsonify(agendamentos)
+    return Response(stream_with_context(gerar_json()), mimetype='application/json')
 
 
 @app.route('/health')
@@ -354,15 +572,25 @@ def health_check():
     return jsonify({'status': 'OK', 'timestamp': datetime.now().isoformat()})
 
 
-# Inicializar o banco de dados quando a aplicação iniciar
-with app.app_context():
+@app.cli.command('init-db')
+def init_db_command():
+    """Cria as tabelas e popula os horários: flask --app app init-db"""
     init_db()
     popular_horarios_disponiveis()
+    print('Banco de dados inicializado.')
+
+
+# Ao importar, só popula os horários se o banco ainda não cobre a janela
+# de 30 dias, evitando que cada worker refaça centenas de INSERTs
+with app.app_context():
+    init_db()
+    if not janela_populada():
+        popular_horarios_disponiveis()
 
 if __name__ == '__main__':
-    # Criar pasta de templates se não existir
-    if not os.path.exists('templates'):
-        os.makedirs('templates')
+    # Criar pasta de arquivos estáticos se não existir
+    if not os.path.exists('static'):
+        os.makedirs('static')
 
     # HTML simplificado e correto (mantendo o mesmo HTML anterior)
     html_content = '''<!DOCTYPE html>
@@ -758,7 +986,7 @@ if __name__ == '__main__':
 </html>'''
 
     # Salvar o HTML
-    with open('templates/index.html', 'w', encoding='utf-8') as f:
+    with open('static/index.html', 'w', encoding='utf-8') as f:
         f.write(html_content)
 
     print("Servidor iniciando...")
@@ -1,23 +1,359 @@
 import sqlite3
 import json
+import atexit
+import itertools
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, date
 from typing import List, Dict, Optional
 
+# orjson é opcional aqui: sem ele, o json da stdlib grava e lê os mesmos valores
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(valor: any) -> str:
+        return orjson.dumps(valor).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# INSERT/UPDATE ... RETURNING existe a partir do SQLite 3.35
+SUPORTA_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Consultas frequentes como constantes do módulo: o mesmo texto SQL a cada
+# chamada mantém o cache de statements do sqlite3 (cached_statements) quente
+SQL_INSERIR_AGENDAMENTO = '''
+    INSERT INTO agendamentos (
+        numero_confirmacao, nome, telefone, servico, codigo_servico,
+        data, horario, valor, duracao, observacoes, ip_cliente, user_agent
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+SQL_INSERIR_AGENDAMENTO_RETURNING = SQL_INSERIR_AGENDAMENTO + ' RETURNING *'
+
+SQL_CHECAR_RESERVA = '''
+    SELECT
+        EXISTS(SELECT 1 FROM agendamentos
+               WHERE data = ? AND horario = ? AND status = 'confirmado'),
+        (SELECT COUNT(*) FROM agendamentos
+         WHERE telefone = ? AND data >= ? AND status = 'confirmado')
+'''
+
+SQL_AGENDAMENTOS_POR_DATA = '''
+    SELECT * FROM agendamentos
+    WHERE data = ? AND status = 'confirmado'
+    ORDER BY horario
+'''
+
+SQL_HORARIOS_OCUPADOS = '''
+    SELECT horario FROM agendamentos
+    WHERE data = ? AND status = 'confirmado'
+'''
+
+SQL_OCUPACOES_POR_DATA = '''
+    SELECT horario, duracao FROM agendamentos
+    WHERE data = ? AND status = 'confirmado'
+    ORDER BY horario
+'''
+
+SQL_AGENDAMENTOS_POR_TELEFONE = '''
+    SELECT * FROM agendamentos
+    WHERE telefone = ? AND data >= ? AND status = 'confirmado'
+    ORDER BY data, horario
+'''
+
+SQL_CONTAR_POR_TELEFONE = '''
+    SELECT COUNT(*) FROM agendamentos
+    WHERE telefone = ? AND data >= ? AND status = 'confirmado'
+'''
+
+SQL_VERIFICAR_DISPONIBILIDADE = '''
+    SELECT EXISTS(
+        SELECT 1 FROM agendamentos
+        WHERE data = ? AND horario = ? AND status = 'confirmado'
+    )
+'''
+
+SQL_CANCELAR_AGENDAMENTO = '''
+    UPDATE agendamentos
+    SET status = 'cancelado',
+        cancelado_em = CURRENT_TIMESTAMP,
+        motivo_cancelamento = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND status = 'confirmado'
+'''
+SQL_CANCELAR_AGENDAMENTO_RETURNING = (
+    SQL_CANCELAR_AGENDAMENTO.rstrip() + ' RETURNING id, nome, telefone, data, horario'
+)
+
+# Estatísticas somadas do resumo diário; mesmas colunas da agregação sobre
+# agendamentos (sem linhas: total e taxa de cancelamento 0, os demais NULL)
+SQL_ESTATISTICAS_RESUMO = '''
+    SELECT
+        COALESCE(SUM(total), 0) as total_agendamentos,
+        SUM(confirmados) as confirmados,
+        SUM(cancelados) as cancelados,
+        SUM(concluidos) as concluidos,
+        SUM(faturamento) as faturamento_total,
+        SUM(faturamento) / SUM(total) as ticket_medio,
+        COALESCE(ROUND(100.0 * SUM(cancelados) / NULLIF(SUM(total), 0), 2), 0)
+            as taxa_cancelamento
+    FROM estatisticas_diarias
+'''
+
+
+class PoolConexoes:
+    """Pool limitado de conexões persistentes, seguro entre threads e forks
+
+    Usado pelo Database e pelo app.py (get_db).
+    """
+
+    def __init__(self, criar_conexao, tamanho: int, espera: float,
+                 usos_entre_optimize: int = 0):
+        self._criar_conexao = criar_conexao
+        self._tamanho = tamanho
+        self._espera = espera
+        # 0 desativa o PRAGMA optimize periódico (ex.: conexões query_only)
+        self._usos_entre_optimize = usos_entre_optimize
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Esvazia o pool; as próximas conexões são abertas neste processo"""
+        self._pid = os.getpid()
+        self._fila = queue.Queue(maxsize=self._tamanho)
+        self._criadas = 0
+        self._lock = threading.Lock()
+        self._usos = itertools.count(1)
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão
+
+        Se o bloco abriu uma transação (BEGIN), faz commit ao sair, ou
+        rollback em caso de erro, e devolve a conexão ao pool.
+        """
+        conn = self.pegar()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.devolver(conn)
+
+    def pegar(self):
+        """Retira uma conexão livre do pool, abrindo outra enquanto couber
+
+        Com o pool esgotado, espera até `espera` segundos e então lança
+        sqlite3.OperationalError.
+        """
+        # Conexões SQLite não podem atravessar um fork (ex.: preload_app do
+        # Gunicorn): um processo filho descarta as herdadas e abre as suas
+        if self._pid != os.getpid():
+            self.reiniciar()
+
+        try:
+            conn = self._fila.get_nowait()
+        except queue.Empty:
+            conn = self._abrir()
+            if conn is not None:
+                return conn
+
+            # Pool esgotado: espera alguém devolver
+            try:
+                conn = self._fila.get(timeout=self._espera)
+            except queue.Empty:
+                raise sqlite3.OperationalError('Nenhuma conexão livre no pool') from None
+
+        # Conexão reaproveitada: confirma que continua utilizável
+        try:
+            conn.execute('SELECT 1')
+        except sqlite3.Error:
+            self._descartar(conn)
+            return self._abrir() or self.pegar()
+        return conn
+
+    def _abrir(self):
+        """Abre uma conexão nova se o pool ainda não chegou ao limite"""
+        with self._lock:
+            if self._criadas >= self._tamanho:
+                return None
+            self._criadas += 1
+
+        try:
+            return self._criar_conexao()
+        except Exception:
+            with self._lock:
+                self._criadas -= 1
+            raise
+
+    def _descartar(self, conn):
+        """Fecha uma conexão e libera sua vaga no pool"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._criadas -= 1
+
+    def devolver(self, conn):
+        """Devolve a conexão ao pool sem transação pendente"""
+        if conn.in_transaction:
+            conn.rollback()
+
+        # De tempos em tempos, mantém as estatísticas do planejador em dia
+        if self._usos_entre_optimize and next(self._usos) % self._usos_entre_optimize == 0:
+            try:
+                conn.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass  # só manutenção; a conexão volta ao pool mesmo assim
+        self._fila.put_nowait(conn)
+
+    def fechar(self):
+        """Fecha as conexões ociosas do pool"""
+        while True:
+            try:
+                conn = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            # Recomendação do SQLite: optimize antes de fechar a conexão
+            if self._usos_entre_optimize:
+                try:
+                    conn.execute('PRAGMA optimize')
+                except sqlite3.Error:
+                    pass
+            self._descartar(conn)
+
 
 class Database:
-    def __init__(self, db_path='barbershop.db'):
+    ESPERA_POOL = 30  # segundos aguardando uma conexão livre
+    USOS_ENTRE_OPTIMIZE = 1000  # devoluções ao pool entre PRAGMA optimize
+
+    def __init__(self, db_path='barbershop.db', tamanho_pool=None):
         self.db_path = db_path
+        # Aceita também URIs, ex.: 'file:barbershop.db?mode=rw'
+        self._usa_uri = db_path.startswith('file:')
+
+        # Pools limitados de conexões persistentes: o cache de páginas e o de
+        # statements preparados sobrevivem entre requisições, e threads de
+        # vida curta não abrem uma conexão cada. No WAL os leitores não
+        # esperam o escritor, desde que usem conexões separadas: um pool de
+        # leitura (query_only) e um único escritor, que serializa as escritas
+        # do processo sem disputar o lock do arquivo com BEGIN IMMEDIATE.
+        # Cada conexão a ':memory:' é um banco diferente e o banco em memória
+        # compartilhado (file::memory:?cache=shared) trava por tabela entre
+        # conexões: nos dois casos leitura e escrita dividem uma só conexão
+        if tamanho_pool is None:
+            tamanho_pool = (os.cpu_count() or 1) * 2
+        self._tamanho_pool = tamanho_pool
+        self.reiniciar_pool()
+
+        # Cache das configurações: chave -> (expira_em, valor)
+        self._config_cache = {}
+        self._config_lock = threading.Lock()
+        self._servicos_cache = None  # (expira_em, lista, dict por código)
+
+        self.ativar_wal()
         self.init_database()
-
-    def get_connection(self):
-        """Cria e retorna uma conexão com o banco"""
-        conn = sqlite3.connect(self.db_path)
+        self.carregar_configuracoes()
+
+    def _em_memoria(self) -> bool:
+        """Indica se o banco vive só na memória (':memory:' ou URI de memória)"""
+        return (self.db_path == ':memory:'
+                or self.db_path.startswith('file::memory:')
+                or (self._usa_uri and 'mode=memory' in self.db_path))
+
+    def ativar_wal(self):
+        """Ativa o modo WAL (persistente no arquivo, basta uma vez)"""
+        # Banco em memória não tem arquivo de WAL
+        if self._em_memoria():
+            return
+
+        conn = sqlite3.connect(self.db_path, uri=self._usa_uri)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+        finally:
+            conn.close()
+
+    def get_write_connection(self):
+        """Empresta a conexão de escrita (commit ao sair de um BEGIN)"""
+        return self._escrita.conexao()
+
+    def get_read_connection(self):
+        """Empresta uma conexão somente leitura"""
+        return self._leitura.conexao()
+
+    # Compatibilidade: quem não diz o que vai fazer recebe a de escrita
+    get_connection = get_write_connection
+
+    def reiniciar_pool(self):
+        """Recria os pools de leitura e escrita (ex.: num worker recém-criado)"""
+        self._escrita = PoolConexoes(self._criar_conexao, 1, self.ESPERA_POOL,
+                                      self.USOS_ENTRE_OPTIMIZE)
+        if self._em_memoria():
+            self._leitura = self._escrita
+        else:
+            self._leitura = PoolConexoes(self._criar_conexao_leitura,
+                                          self._tamanho_pool, self.ESPERA_POOL)
+
+    def _criar_conexao(self):
+        """Abre e configura uma nova conexão com o banco"""
+        # check_same_thread=False: a conexão passa de thread em thread pelo pool.
+        # O módulo sqlite3 guarda os statements preparados por texto SQL; com
+        # a conexão persistente, as consultas repetidas não são re-parseadas.
+        # isolation_level=None: sem BEGIN implícito; cada escrita isolada já é
+        # atômica e os blocos com várias instruções abrem BEGIN explicitamente
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=256, uri=self._usa_uri,
+                               isolation_level=None)
         conn.row_factory = sqlite3.Row  # Permite acessar colunas por nome
+
+        # Ajustes válidos por conexão: leitores e escritor concorrentes no WAL,
+        # menos fsync por commit e temporários/cache em memória
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')  # 64 MiB
+        conn.execute('PRAGMA mmap_size=268435456')
+        # Checkpoint automático a cada ~1000 páginas de WAL, explícito para
+        # o arquivo não crescer sem limite sob escrita contínua
+        conn.execute('PRAGMA wal_autocheckpoint=1000')
+        return conn
+
+    def _criar_conexao_leitura(self):
+        """Abre uma conexão que recusa qualquer escrita"""
+        conn = self._criar_conexao()
+        conn.execute('PRAGMA query_only=true')
         return conn
 
+    def fechar_conexoes(self):
+        """Fecha as conexões ociosas dos pools"""
+        self._leitura.fechar()
+        self._escrita.fechar()
+
+    @staticmethod
+    def _buscar_dicts(conn, sql: str, params=()) -> List[Dict]:
+        """Executa a consulta e devolve as linhas como dicts
+
+        O cursor usa tuplas simples (sem sqlite3.Row intermediário) e os nomes
+        das colunas são lidos uma só vez de cursor.description.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        colunas = [coluna[0] for coluna in cursor.description]
+        return [dict(zip(colunas, row)) for row in cursor]
+
     def init_database(self):
         """Inicializa o banco de dados com as tabelas necessárias"""
-        with self.get_connection() as conn:
+        with self.get_write_connection() as conn:
+            # DDL e dados padrão numa só transação (um único fsync no boot).
+            # IMMEDIATE: workers subindo juntos esperam a vez em vez de falhar
+            # ao tentar promover uma leitura para escrita
+            conn.execute('BEGIN IMMEDIATE')
+
             # Tabela de agendamentos
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS agendamentos (
@@ -43,8 +379,28 @@ class Database:
             ''')
 
             # Índices para melhor performance
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_agendamentos_data_horario ON agendamentos(data, horario)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_agendamentos_telefone ON agendamentos(telefone)')
+            # Os índices por data e por telefone da versão original são
+            # substituídos pelos parciais abaixo
+            conn.execute('DROP INDEX IF EXISTS idx_agendamentos_data_horario')
+            conn.execute('DROP INDEX IF EXISTS idx_agendamentos_telefone')
+
+            # Toda consulta por data filtra status = 'confirmado': índice parcial
+            # e cobrindo, que responde disponibilidade e ocupações da data sem
+            # indexar cancelados. status vai no fim porque o SQLite só considera
+            # o índice cobrindo se ele contém todas as colunas citadas na consulta
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_ag_confirmados_data
+                ON agendamentos(data, horario, duracao, status) WHERE status = 'confirmado'
+            ''')
+
+            # Busca e contagem por telefone também só olham confirmados: o
+            # intervalo de data já sai na ordem de data, horario, e a contagem
+            # fica só no índice
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_ag_confirmados_telefone
+                ON agendamentos(telefone, data, horario, status) WHERE status = 'confirmado'
+            ''')
+
             conn.execute('CREATE INDEX IF NOT EXISTS idx_agendamentos_status ON agendamentos(status)')
             conn.execute(
                 'CREATE INDEX IF NOT EXISTS idx_agendamentos_numero_confirmacao ON agendamentos(numero_confirmacao)')
@@ -55,27 +411,16 @@ class Database:
                     chave TEXT PRIMARY KEY,
                     valor TEXT NOT NULL,
                     descricao TEXT,
+                    tipo TEXT DEFAULT 'str',
                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
-
-            # Inserir configurações padrão
-            configs = [
-                ('dias_funcionamento', '[1,2,3,4,5,6]', 'Dias da semana que funciona (0=Domingo, 1=Segunda...)'),
-                ('horario_abertura', '09:00', 'Horário de abertura'),
-                ('horario_fechamento', '19:00', 'Horário de fechamento'),
-                ('intervalo_almoco_inicio', '12:00', 'Início do intervalo de almoço'),
-                ('intervalo_almoco_fim', '13:00', 'Fim do intervalo de almoço'),
-                ('duracao_padrao', '30', 'Duração padrão dos serviços em minutos'),
-                ('feriados',
-                 '["2024-01-01", "2024-04-21", "2024-05-01", "2024-09-07", "2024-10-12", "2024-11-02", "2024-11-15", "2024-12-25"]',
-                 'Lista de feriados')
-            ]
-
-            conn.executemany('''
-                INSERT OR IGNORE INTO configuracoes (chave, valor, descricao) 
-                VALUES (?, ?, ?)
-            ''', configs)
+            # tipo diz como ler o valor: 'str' volta como está, 'json' é decodificado.
+            # Banco anterior à coluna: é JSON o que o SQLite reconhece como tal
+            colunas = {row['name'] for row in conn.execute('PRAGMA table_info(configuracoes)')}
+            if 'tipo' not in colunas:
+                conn.execute("ALTER TABLE configuracoes ADD COLUMN tipo TEXT DEFAULT 'str'")
+                conn.execute("UPDATE configuracoes SET tipo = 'json' WHERE json_valid(valor)")
 
             # Tabela de serviços
             conn.execute('''
@@ -90,42 +435,168 @@ class Database:
                 )
             ''')
 
-            # Inserir serviços padrão
-            servicos = [
-                ('corte', 'Corte Social', 'Corte tradicional masculino', 30, 45.00),
-                ('kids', 'Corte Kids', 'Corte especial para crianças', 25, 35.00),
-                ('combo', 'Cabelo e Barba', 'Corte completo com acabamento na barba', 50, 70.00),
-                ('degrade', 'Degradê Giletado', 'Técnica de degradê com gilete', 40, 60.00)
-            ]
+            # Resumo diário mantido por triggers para as estatísticas
+            self._criar_estatisticas_diarias(conn)
+
+            # Inserir dados padrão só num banco novo; uma consulta verifica as duas tabelas
+            tem_configs, tem_servicos = conn.execute(
+                'SELECT EXISTS(SELECT 1 FROM configuracoes), EXISTS(SELECT 1 FROM servicos)'
+            ).fetchone()
+            if not tem_configs:
+                self._inserir_configuracoes_padrao(conn)
+            if not tem_servicos:
+                self._inserir_servicos_padrao(conn)
+
+        # Estatísticas do planejador: ANALYZE completo só no primeiro boot;
+        # depois o PRAGMA optimize reanalisa apenas o que mudou
+        with self.get_write_connection() as conn:
+            tem_estatisticas = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone()
+            conn.execute('PRAGMA optimize' if tem_estatisticas else 'ANALYZE')
+
+    def _criar_estatisticas_diarias(self, conn):
+        """Cria o resumo por dia de criação dos agendamentos e os triggers que o mantêm"""
+        existia = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'estatisticas_diarias'"
+        ).fetchone()
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS estatisticas_diarias (
+                dia DATE PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0,
+                confirmados INTEGER NOT NULL DEFAULT 0,
+                cancelados INTEGER NOT NULL DEFAULT 0,
+                concluidos INTEGER NOT NULL DEFAULT 0,
+                faturamento REAL NOT NULL DEFAULT 0
+            )
+        ''')
+
+        # Cada trigger soma (+1) a linha nova e/ou subtrai (-1) a antiga no dia de created_at
+        somar = '''
+            INSERT INTO estatisticas_diarias (dia, total, confirmados, cancelados, concluidos, faturamento)
+            VALUES (DATE({r}.created_at), {s}1, {s}({r}.status = 'confirmado'), {s}({r}.status = 'cancelado'),
+                    {s}({r}.status = 'concluido'), {s}{r}.valor)
+            ON CONFLICT(dia) DO UPDATE SET
+                total = total + excluded.total,
+                confirmados = confirmados + excluded.confirmados,
+                cancelados = cancelados + excluded.cancelados,
+                concluidos = concluidos + excluded.concluidos,
+                faturamento = faturamento + excluded.faturamento;
+        '''
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_estatisticas_insert AFTER INSERT ON agendamentos
+            BEGIN {somar.format(r='NEW', s='')} END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_estatisticas_update
+            AFTER UPDATE OF status, valor, created_at ON agendamentos
+            BEGIN {somar.format(r='OLD', s='-')} {somar.format(r='NEW', s='')} END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_estatisticas_delete AFTER DELETE ON agendamentos
+            BEGIN {somar.format(r='OLD', s='-')} END
+        ''')
+
+        # Banco existente: o resumo começa com o histórico já gravado
+        if not existia:
+            conn.execute('''
+                INSERT INTO estatisticas_diarias (dia, total, confirmados, cancelados, concluidos, faturamento)
+                SELECT DATE(created_at), COUNT(*),
+                       SUM(status = 'confirmado'), SUM(status = 'cancelado'),
+                       SUM(status = 'concluido'), SUM(valor)
+                FROM agendamentos
+                GROUP BY DATE(created_at)
+            ''')
 
-            conn.executemany('''
-                INSERT OR IGNORE INTO servicos (codigo, nome, descricao, duracao, valor) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', servicos)
+    def _inserir_configuracoes_padrao(self, conn):
+        """Insere as configurações padrão do sistema"""
+        configs = [
+            ('dias_funcionamento', '[1,2,3,4,5,6]', 'Dias da semana que funciona (0=Domingo, 1=Segunda...)',
+             'json'),
+            ('horario_abertura', '09:00', 'Horário de abertura', 'str'),
+            ('horario_fechamento', '19:00', 'Horário de fechamento', 'str'),
+            ('intervalo_almoco_inicio', '12:00', 'Início do intervalo de almoço', 'str'),
+            ('intervalo_almoco_fim', '13:00', 'Fim do intervalo de almoço', 'str'),
+            ('duracao_padrao', '30', 'Duração padrão dos serviços em minutos', 'json'),
+            ('feriados',
+             '["2024-01-01", "2024-04-21", "2024-05-01", "2024-09-07", "2024-10-12", "2024-11-02", "2024-11-15", "2024-12-25"]',
+             'Lista de feriados', 'json')
+        ]
+
+        # Um único INSERT com várias linhas em VALUES
+        conn.execute(
+            'INSERT OR IGNORE INTO configuracoes (chave, valor, descricao, tipo) VALUES '
+            + ','.join(['(?, ?, ?, ?)'] * len(configs)),
+            [campo for config in configs for campo in config]
+        )
+
+    def _inserir_servicos_padrao(self, conn):
+        """Insere os serviços padrão da barbearia"""
+        servicos = [
+            ('corte', 'Corte Social', 'Corte tradicional masculino', 30, 45.00),
+            ('kids', 'Corte Kids', 'Corte especial para crianças', 25, 35.00),
+            ('combo', 'Cabelo e Barba', 'Corte completo com acabamento na barba', 50, 70.00),
+            ('degrade', 'Degradê Giletado', 'Técnica de degradê com gilete', 40, 60.00)
+        ]
+
+        conn.execute(
+            'INSERT OR IGNORE INTO servicos (codigo, nome, descricao, duracao, valor) VALUES '
+            + ','.join(['(?, ?, ?, ?, ?)'] * len(servicos)),
+            [campo for servico in servicos for campo in servico]
+        )
 
     # Métodos para agendamentos
     def criar_agendamento(self, agendamento_data: Dict) -> Dict:
         """Cria um novo agendamento"""
-        with self.get_connection() as conn:
-            cursor = conn.execute('''
-                INSERT INTO agendamentos (
-                    numero_confirmacao, nome, telefone, servico, codigo_servico,
-                    data, horario, valor, duracao, observacoes, ip_cliente, user_agent
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                agendamento_data['numero_confirmacao'],
-                agendamento_data['nome'],
-                agendamento_data['telefone'],
-                agendamento_data['servico'],
-                agendamento_data['codigo_servico'],
+        with self.get_write_connection() as conn:
+            return self._inserir_agendamento(conn, agendamento_data)
+
+    def reservar(self, agendamento_data: Dict, limite_por_telefone: int = 3) -> tuple:
+        """Valida e cria um agendamento numa única transação
+
+        Retorna (agendamento, None) ou (None, mensagem de erro).
+        """
+        with self.get_write_connection() as conn:
+            # Trava de escrita desde a validação: duas reservas simultâneas
+            # não passam ambas pela checagem do mesmo horário
+            conn.execute('BEGIN IMMEDIATE')
+            ocupado, futuros = conn.execute(SQL_CHECAR_RESERVA, (
                 agendamento_data['data'],
                 agendamento_data['horario'],
-                agendamento_data['valor'],
-                agendamento_data['duracao'],
-                agendamento_data.get('observacoes', ''),
-                agendamento_data.get('ip_cliente', ''),
-                agendamento_data.get('user_agent', '')
-            ))
+                agendamento_data['telefone'],
+                date.today().isoformat()
+            )).fetchone()
+
+            if ocupado:
+                return None, 'Horário indisponível'
+            if futuros >= limite_por_telefone:
+                return None, 'Limite de agendamentos para este telefone atingido'
+
+            return self._inserir_agendamento(conn, agendamento_data), None
+
+    def criar_agendamentos_em_lote(self, agendamentos: List[Dict]) -> int:
+        """Cria vários agendamentos numa única transação (importações)
+
+        Não devolve as linhas criadas, só a quantidade inserida.
+        """
+        with self.get_write_connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.executemany(
+                SQL_INSERIR_AGENDAMENTO,
+                (self._parametros_agendamento(ag) for ag in agendamentos)
+            )
+            return cursor.rowcount
+
+    def _inserir_agendamento(self, conn, agendamento_data: Dict) -> Dict:
+        """Insere o agendamento na transação corrente e devolve a linha criada"""
+        params = self._parametros_agendamento(agendamento_data)
+
+        if SUPORTA_RETURNING:
+            # Insere e devolve a linha criada numa única instrução
+            agendamento = conn.execute(SQL_INSERIR_AGENDAMENTO_RETURNING, params).fetchone()
+        else:
+            cursor = conn.execute(SQL_INSERIR_AGENDAMENTO, params)
 
             # Buscar o agendamento criado
             agendamento = conn.execute(
@@ -133,128 +604,250 @@ class Database:
                 (cursor.lastrowid,)
             ).fetchone()
 
-            return dict(agendamento) if agendamento else None
+        return dict(agendamento) if agendamento else None
+
+    @staticmethod
+    def _parametros_agendamento(agendamento_data: Dict) -> tuple:
+        """Parâmetros de SQL_INSERIR_AGENDAMENTO, na ordem das colunas"""
+        return (
+            agendamento_data['numero_confirmacao'],
+            agendamento_data['nome'],
+            agendamento_data['telefone'],
+            agendamento_data['servico'],
+            agendamento_data['codigo_servico'],
+            agendamento_data['data'],
+            agendamento_data['horario'],
+            agendamento_data['valor'],
+            agendamento_data['duracao'],
+            agendamento_data.get('observacoes', ''),
+            agendamento_data.get('ip_cliente', ''),
+            agendamento_data.get('user_agent', '')
+        )
 
     def buscar_agendamentos_por_data(self, data: str) -> List[Dict]:
         """Busca agendamentos por data"""
-        with self.get_connection() as conn:
-            cursor = conn.execute('''
-                SELECT * FROM agendamentos 
-                WHERE data = ? AND status = 'confirmado'
-                ORDER BY horario
-            ''', (data,))
+        with self.get_read_connection() as conn:
+            return self._buscar_dicts(conn, SQL_AGENDAMENTOS_POR_DATA, (data,))
+
+    def obter_horarios_ocupados(self, data: str) -> set:
+        """Retorna apenas os horários já confirmados na data"""
+        with self.get_read_connection() as conn:
+            cursor = conn.execute(SQL_HORARIOS_OCUPADOS, (data,))
 
-            return [dict(row) for row in cursor.fetchall()]
+            return {row[0] for row in cursor}
+
+    def buscar_ocupacoes_por_data(self, data: str) -> List[tuple]:
+        """Retorna (início em minutos do dia, duração) dos agendamentos confirmados da data"""
+        with self.get_read_connection() as conn:
+            cursor = conn.execute(SQL_OCUPACOES_POR_DATA, (data,))
+
+            return [(int(horario[:2]) * 60 + int(horario[3:5]), duracao)
+                    for horario, duracao in cursor]
 
     def buscar_agendamentos_por_telefone(self, telefone: str) -> List[Dict]:
         """Busca agendamentos futuros por telefone"""
-        with self.get_connection() as conn:
-            cursor = conn.execute('''
-                SELECT * FROM agendamentos 
-                WHERE telefone = ? AND data >= date('now') AND status = 'confirmado'
-                ORDER BY data, horario
-            ''', (telefone,))
+        with self.get_read_connection() as conn:
+            return self._buscar_dicts(conn, SQL_AGENDAMENTOS_POR_TELEFONE,
+                                      (telefone, date.today().isoformat()))
+
+    def contar_agendamentos_futuros_por_telefone(self, telefone: str) -> int:
+        """Conta os agendamentos futuros de um telefone sem carregar as linhas"""
+        with self.get_read_connection() as conn:
+            cursor = conn.execute(SQL_CONTAR_POR_TELEFONE, (telefone, date.today().isoformat()))
 
-            return [dict(row) for row in cursor.fetchall()]
+            return cursor.fetchone()[0]
 
     def verificar_disponibilidade(self, data: str, horario: str) -> bool:
         """Verifica se um horário está disponível"""
-        with self.get_connection() as conn:
-            cursor = conn.execute('''
-                SELECT COUNT(*) as count FROM agendamentos 
-                WHERE data = ? AND horario = ? AND status = 'confirmado'
-            ''', (data, horario))
-
-            result = cursor.fetchone()
-            return result['count'] == 0
-
-    def cancelar_agendamento(self, agendamento_id: int, motivo: str = "") -> bool:
-        """Cancela um agendamento"""
-        with self.get_connection() as conn:
-            cursor = conn.execute('''
-                UPDATE agendamentos 
-                SET status = 'cancelado', 
-                    cancelado_em = CURRENT_TIMESTAMP,
-                    motivo_cancelamento = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ? AND status = 'confirmado'
-            ''', (motivo, agendamento_id))
-
-            return cursor.rowcount > 0
+        with self.get_read_connection() as conn:
+            # EXISTS para na primeira linha; não precisa contar todas
+            cursor = conn.execute(SQL_VERIFICAR_DISPONIBILIDADE, (data, horario))
+
+            return not cursor.fetchone()[0]
+
+    def cancelar_agendamento(self, agendamento_id: int, motivo: str = "") -> Optional[Dict]:
+        """Cancela um agendamento e devolve seus dados (None se não havia o que cancelar)"""
+        with self.get_write_connection() as conn:
+            if SUPORTA_RETURNING:
+                row = conn.execute(SQL_CANCELAR_AGENDAMENTO_RETURNING,
+                                   (motivo, agendamento_id)).fetchone()
+                return dict(row) if row else None
+
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute(SQL_CANCELAR_AGENDAMENTO, (motivo, agendamento_id))
+            if cursor.rowcount == 0:
+                return None
+
+            row = conn.execute(
+                'SELECT id, nome, telefone, data, horario FROM agendamentos WHERE id = ?',
+                (agendamento_id,)
+            ).fetchone()
+            return dict(row)
 
     # Métodos para configurações
+    CONFIG_TTL = 60  # segundos; cobre alterações feitas por outros processos
+
+    def carregar_configuracoes(self):
+        """Lê e decodifica todas as configurações de uma vez para o cache"""
+        with self.get_read_connection() as conn:
+            cursor = conn.execute('SELECT chave, valor, tipo FROM configuracoes')
+            valores = {row['chave']: self._decodificar_valor(row['valor'], row['tipo']) for row in cursor}
+
+        expira_em = time.monotonic() + self.CONFIG_TTL
+        with self._config_lock:
+            self._config_cache = {chave: (expira_em, valor) for chave, valor in valores.items()}
+
     def obter_configuracao(self, chave: str) -> any:
         """Obtém uma configuração do sistema"""
-        with self.get_connection() as conn:
+        return self.obter_configuracoes([chave]).get(chave)
+
+    def obter_configuracoes(self, chaves: List[str]) -> Dict:
+        """Obtém várias configurações de uma vez, usando o cache em memória"""
+        agora = time.monotonic()
+        valores = {}
+        faltando = []
+        with self._config_lock:
+            for chave in chaves:
+                item = self._config_cache.get(chave)
+                if item and item[0] > agora:
+                    valores[chave] = item[1]
+                else:
+                    faltando.append(chave)
+
+        if not faltando:
+            return valores
+
+        with self.get_read_connection() as conn:
             cursor = conn.execute(
-                'SELECT valor FROM configuracoes WHERE chave = ?',
-                (chave,)
+                'SELECT chave, valor, tipo FROM configuracoes WHERE chave IN (%s)'
+                % ','.join('?' * len(faltando)),
+                faltando
             )
-            result = cursor.fetchone()
-            return json.loads(result['valor']) if result else None
+            lidos = {row['chave']: self._decodificar_valor(row['valor'], row['tipo']) for row in cursor}
+
+        expira_em = agora + self.CONFIG_TTL
+        with self._config_lock:
+            for chave in faltando:
+                valor = lidos.get(chave)
+                self._config_cache[chave] = (expira_em, valor)
+                valores[chave] = valor
+        return valores
+
+    @staticmethod
+    def _decodificar_valor(valor: str, tipo: str) -> any:
+        """Decodifica o valor salvo conforme a coluna tipo"""
+        return _json_loads(valor) if tipo == 'json' else valor
 
     def atualizar_configuracao(self, chave: str, valor: any):
         """Atualiza uma configuração do sistema"""
-        with self.get_connection() as conn:
+        # Textos são gravados como estão; o resto, em JSON
+        if isinstance(valor, str):
+            texto, tipo = valor, 'str'
+        else:
+            texto, tipo = _json_dumps(valor), 'json'
+
+        with self.get_write_connection() as conn:
             conn.execute('''
-                INSERT OR REPLACE INTO configuracoes (chave, valor, updated_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP)
-            ''', (chave, json.dumps(valor)))
+                INSERT OR REPLACE INTO configuracoes (chave, valor, tipo, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (chave, texto, tipo))
+
+        # O próprio processo já enxerga o valor novo, sem reler a tabela;
+        # decodificado do texto salvo para não guardar o objeto do chamador
+        with self._config_lock:
+            self._config_cache[chave] = (time.monotonic() + self.CONFIG_TTL, self._decodificar_valor(texto, tipo))
+
+    def invalidar_configuracoes(self):
+        """Descarta o cache de configurações (após alterar a tabela por fora)"""
+        with self._config_lock:
+            self._config_cache.clear()
 
     # Métodos para serviços
     def obter_servicos(self) -> List[Dict]:
         """Obtém todos os serviços ativos"""
-        with self.get_connection() as conn:
-            cursor = conn.execute(
-                'SELECT * FROM servicos WHERE ativo = 1 ORDER BY valor'
-            )
-            return [dict(row) for row in cursor.fetchall()]
+        return self._servicos_ativos()[0]
 
     def obter_servico(self, codigo: str) -> Optional[Dict]:
         """Obtém um serviço específico"""
-        with self.get_connection() as conn:
-            cursor = conn.execute(
-                'SELECT * FROM servicos WHERE codigo = ? AND ativo = 1',
-                (codigo,)
+        return self._servicos_ativos()[1].get(codigo)
+
+    def _servicos_ativos(self) -> tuple:
+        """Lista e índice por código dos serviços ativos, com o mesmo cache das configurações"""
+        agora = time.monotonic()
+        cache = self._servicos_cache
+        if cache and cache[0] > agora:
+            return cache[1], cache[2]
+
+        with self.get_read_connection() as conn:
+            servicos = self._buscar_dicts(
+                conn, 'SELECT * FROM servicos WHERE ativo = 1 ORDER BY valor'
             )
-            result = cursor.fetchone()
-            return dict(result) if result else None
+
+        por_codigo = {servico['codigo']: servico for servico in servicos}
+        self._servicos_cache = (agora + self.CONFIG_TTL, servicos, por_codigo)
+        return servicos, por_codigo
+
+    def invalidar_servicos(self):
+        """Descarta o cache de serviços (após alterar a tabela por fora)"""
+        self._servicos_cache = None
 
     # Estatísticas
     def obter_estatisticas(self, data_inicio: str = None, data_fim: str = None) -> Dict:
         """Obtém estatísticas dos agendamentos"""
-        with self.get_connection() as conn:
-            where_clause = ""
-            params = []
-
-            if data_inicio and data_fim:
-                where_clause = "WHERE created_at BETWEEN ? AND ?"
-                params = [data_inicio, data_fim]
-
-            cursor = conn.execute(f'''
-                SELECT 
-                    COUNT(*) as total_agendamentos,
-                    SUM(CASE WHEN status = 'confirmado' THEN 1 ELSE 0 END) as confirmados,
-                    SUM(CASE WHEN status = 'cancelado' THEN 1 ELSE 0 END) as cancelados,
-                    SUM(CASE WHEN status = 'concluido' THEN 1 ELSE 0 END) as concluidos,
-                    SUM(valor) as faturamento_total,
-                    AVG(valor) as ticket_medio
-                FROM agendamentos
-                {where_clause}
-            ''', params)
-
-            stats = dict(cursor.fetchone())
-
-            # Calcular taxa de cancelamento
-            if stats['total_agendamentos'] > 0:
-                stats['taxa_cancelamento'] = round(
-                    (stats['cancelados'] / stats['total_agendamentos']) * 100, 2
+        with self.get_read_connection() as conn:
+            if not (data_inicio and data_fim):
+                cursor = conn.execute(SQL_ESTATISTICAS_RESUMO)
+            elif self._e_data(data_inicio) and self._e_data(data_fim):
+                # created_at BETWEEN 'AAAA-MM-DD' AND 'AAAA-MM-DD' cobre do primeiro
+                # dia até antes do último (created_at sempre tem hora): no resumo,
+                # dia >= início AND dia < fim
+                cursor = conn.execute(
+                    SQL_ESTATISTICAS_RESUMO + 'WHERE dia >= ? AND dia < ?',
+                    (data_inicio, data_fim)
                 )
             else:
-                stats['taxa_cancelamento'] = 0
-
-            return stats
-
-
-# Instância global do banco de dados
-db = Database()
\ No newline at end of file
+                # Intervalo com hora: só a tabela completa responde com exatidão
+                cursor = conn.execute('''
+                    SELECT 
+                        COUNT(*) as total_agendamentos,
+                        SUM(CASE WHEN status = 'confirmado' THEN 1 ELSE 0 END) as confirmados,
+                        SUM(CASE WHEN status = 'cancelado' THEN 1 ELSE 0 END) as cancelados,
+                        SUM(CASE WHEN status = 'concluido' THEN 1 ELSE 0 END) as concluidos,
+                        SUM(valor) as faturamento_total,
+                        AVG(valor) as ticket_medio,
+                        COALESCE(ROUND(100.0 * SUM(CASE WHEN status = 'cancelado' THEN 1 ELSE 0 END)
+                                       / NULLIF(COUNT(*), 0), 2), 0) as taxa_cancelamento
+                    FROM agendamentos
+                    WHERE created_at BETWEEN ? AND ?
+                ''', (data_inicio, data_fim))
+
+            return dict(cursor.fetchone())
+
+    @staticmethod
+    def _e_data(valor: str) -> bool:
+        """Indica se o texto é uma data pura no formato AAAA-MM-DD"""
+        try:
+            date.fromisoformat(valor)
+        except ValueError:
+            return False
+        return len(valor) == 10
+
+
+# Instância global do banco de dados, criada no primeiro acesso a database.db
+# para que importar a classe (ex.: nos testes) não abra o arquivo de produção
+_db: Optional[Database] = None
+_db_lock = threading.Lock()
+
+
+def __getattr__(nome):
+    global _db
+    if nome != 'db':
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = Database()
+                # Só a instância do módulo vive até o fim do processo; quem cria
+                # outro Database chama fechar_conexoes ao terminar
+                atexit.register(_db.fechar_conexoes)
+    return _db
\ No newline at end of file
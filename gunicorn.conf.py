@@ -1,8 +1,30 @@
 # Configurações do Gunicorn
 import multiprocessing
 
-# Número de workers (ajuste conforme necessário)
-workers = multiprocessing.cpu_count() * 2 + 1
+# Workers com threads: o trabalho é quase todo SQLite, que bloqueia dentro de
+# C (o gevent não consegue alternar durante a consulta), enquanto threads
+# de verdade usam os leitores concorrentes do WAL
+worker_class = "gthread"
+
+# Um worker por CPU, cada um com threads do tamanho do pool de conexões do app
+workers = multiprocessing.cpu_count()
+threads = 8
+
+# Carrega o app uma vez no processo mestre, então init_db e a carga dos
+# horários rodam uma só vez; o pool de conexões é recriado em cada worker
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Descarta as conexões SQLite herdadas do mestre e aquece as do worker"""
+    from app import app, pool, disponibilidade, data_de_hoje
+    pool.reiniciar()
+
+    # Carrega o mapa de horários antes da primeira requisição, que assim não
+    # paga o cache frio
+    hoje = data_de_hoje().isoformat()
+    with app.app_context():
+        disponibilidade.horarios(hoje)
 
 # Endereço e porta
 bind = "0.0.0.0:10000"
@@ -14,8 +36,6 @@ timeout = 120
 accesslog = "-"
 errorlog = "-"
 
-# Configurações de performance
-worker_class = "sync"
-worker_connections = 1000
+# Reciclagem de workers
 max_requests = 1000
 max_requests_jitter = 100
\ No newline at end of file
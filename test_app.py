@@ -0,0 +1,63 @@
+import gzip
+import os
+import tempfile
+
+# Importar o app cria as tabelas e popula os horários: usa um banco temporário
+os.environ.setdefault('BARBEARIA_DB', os.path.join(tempfile.mkdtemp(), 'barbearia.db'))
+
+from app import app, disponibilidade
+
+
+def test_index_revalida_com_compressao():
+    cliente = app.test_client()
+
+    with open(os.path.join(app.static_folder, 'index.html'), 'rb') as f:
+        html = f.read()
+
+    for codificacao in ('gzip', 'br', 'identity'):
+        resposta = cliente.get('/', headers={'Accept-Encoding': codificacao})
+        assert resposta.status_code == 200
+        etag = resposta.headers['ETag']
+
+        # O navegador devolve o ETag recebido: a página não mudou, então 304
+        revalidacao = cliente.get('/', headers={
+            'Accept-Encoding': codificacao,
+            'If-None-Match': etag,
+        })
+        assert revalidacao.status_code == 304, codificacao
+        assert revalidacao.headers['ETag'] == etag
+
+    resposta = cliente.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(resposta.data) == html
+
+
+def test_horarios_aceita_so_yyyy_mm_dd():
+    cliente = app.test_client()
+
+    for data in ('20301015', '2030-W42-3', '2030-10-15T00:00'):
+        resposta = cliente.get('/horarios', query_string={'data': data})
+        assert resposta.status_code == 400, data
+
+    # Data válida fora do mapa: lista vazia sem ocupar o cache
+    resposta = cliente.get('/horarios', query_string={'data': '9999-12-31'})
+    assert resposta.status_code == 200 and resposta.get_json() == []
+    with app.app_context():
+        disponibilidade.horarios_json('9999-12-30')
+    assert '9999-12-31' not in disponibilidade._json
+    assert '9999-12-30' not in disponibilidade._json
+
+
+def test_agendamentos_segue_em_streaming():
+    # Comprimir o stream leria a lista inteira para calcular o Content-Length
+    resposta = app.test_client().get('/agendamentos', headers={'Accept-Encoding': 'gzip'})
+    assert resposta.status_code == 200 and resposta.is_streamed
+    assert 'Content-Encoding' not in resposta.headers
+    assert 'Content-Length' not in resposta.headers
+    assert isinstance(resposta.get_json(), list)
+
+
+if __name__ == '__main__':
+    for nome, teste in list(globals().items()):
+        if nome.startswith('test_'):
+            teste()
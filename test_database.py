@@ -1,6 +1,41 @@
-from database import db
+import sqlite3
+from contextlib import contextmanager
+
+from database import Database
 from datetime import datetime, timedelta
 
+# Banco em memória compartilhado: nada de disco nem do barbershop.db de produção
+db = Database('file::memory:?cache=shared')
+
+_numeros = iter(range(1, 10000))
+
+
+@contextmanager
+def banco_privado():
+    """Banco em memória só do teste, fechado ao sair do bloco"""
+    banco = Database(':memory:')
+    try:
+        yield banco
+    finally:
+        banco.fechar_conexoes()
+
+
+def novo_agendamento(**campos):
+    """Dados de um agendamento válido, com número de confirmação único"""
+    agendamento = {
+        'numero_confirmacao': f'TESTE{next(_numeros)}',
+        'nome': 'Cliente Teste',
+        'telefone': '16999990000',
+        'servico': 'Corte Social',
+        'codigo_servico': 'corte',
+        'data': '2030-01-07',
+        'horario': '09:00',
+        'valor': 45.0,
+        'duracao': 30,
+    }
+    agendamento.update(campos)
+    return agendamento
+
 
 def test_database():
     print("🧪 TESTANDO BANCO DE DADOS")
@@ -17,9 +52,9 @@ def test_database():
         'feriados'
     ]
 
+    valores = db.obter_configuracoes(configs)
     for config in configs:
-        valor = db.obter_configuracao(config)
-        print(f"  {config}: {valor}")
+        print(f"  {config}: {valores[config]}")
 
     # Testar serviços
     print("\n✂️  SERVIÇOS:")
@@ -37,11 +72,165 @@ def test_database():
 
     # Testar disponibilidade
     print(f"\n🔍 DISPONIBILIDADE PARA {amanha}:")
+    ocupados = db.obter_horarios_ocupados(amanha)
     for hora in ['09:00', '10:00', '11:00', '14:00', '15:00']:
-        disponivel = db.verificar_disponibilidade(amanha, hora)
-        status = "✅ Disponível" if disponivel else "❌ Ocupado"
+        status = "❌ Ocupado" if hora in ocupados else "✅ Disponível"
         print(f"  {hora}: {status}")
 
 
+def test_configuracoes_ida_e_volta():
+    valores = {
+        'teste_int': 30,
+        'teste_float': 1.5,
+        'teste_negativo': -3,
+        'teste_bool': True,
+        'teste_lista': [1, 2, 3],
+        'teste_texto': '09:00',
+    }
+    for chave, valor in valores.items():
+        db.atualizar_configuracao(chave, valor)
+
+    # Do cache escrito na hora e relido da tabela
+    for _ in range(2):
+        for chave, valor in valores.items():
+            lido = db.obter_configuracao(chave)
+            assert lido == valor and type(lido) is type(valor), (chave, lido)
+        db.invalidar_configuracoes()
+
+    # Padrões: listas e números marcados como json, horários como str
+    assert db.obter_configuracoes(['duracao_padrao', 'horario_abertura', 'dias_funcionamento']) == {
+        'duracao_padrao': 30,
+        'horario_abertura': '09:00',
+        'dias_funcionamento': [1, 2, 3, 4, 5, 6],
+    }
+
+    # Linha gravada por fora sem tipo: o padrão 'str' devolve o texto como está
+    with db.get_write_connection() as conn:
+        conn.execute("INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES ('teste_cru', '[12:30')")
+    db.invalidar_configuracoes()
+    assert db.obter_configuracao('teste_cru') == '[12:30'
+
+
+def test_estatisticas_resumo_igual_a_tabela():
+    # Banco próprio: os totais não se misturam com os de outros testes
+    with banco_privado() as banco:
+        criados = [
+            banco.criar_agendamento(novo_agendamento(horario=horario, valor=valor))
+            for horario, valor in (('09:00', 45.0), ('10:00', 60.0),
+                                   ('11:00', 70.0), ('14:00', 35.0))
+        ]
+
+        # created_at de dias diferentes exercita o trigger de UPDATE entre dias
+        with banco.get_write_connection() as conn:
+            for ag, criado_em in zip(criados, ('2026-01-01 10:00:00', '2026-01-02 10:00:00',
+                                               '2026-01-03 10:00:00', '2026-01-03 18:00:00')):
+                conn.execute('UPDATE agendamentos SET created_at = ? WHERE id = ?',
+                             (criado_em, ag['id']))
+
+        banco.cancelar_agendamento(criados[0]['id'])
+        with banco.get_write_connection() as conn:
+            conn.execute('UPDATE agendamentos SET valor = 80.0 WHERE id = ?', (criados[1]['id'],))
+            conn.execute("UPDATE agendamentos SET status = 'concluido' WHERE id = ?",
+                         (criados[2]['id'],))
+            conn.execute('DELETE FROM agendamentos WHERE id = ?', (criados[3]['id'],))
+
+        # Intervalos com hora vão direto à tabela de agendamentos
+        tudo = banco.obter_estatisticas('2000-01-01 00:00:00', '2100-01-01 00:00:00')
+        assert banco.obter_estatisticas() == tudo
+        assert tudo['total_agendamentos'] == 3 and tudo['cancelados'] == 1
+        assert tudo['faturamento_total'] == 45.0 + 80.0 + 70.0
+        assert tudo['taxa_cancelamento'] == 33.33
+
+        # Só datas: dia >= início AND dia < fim no resumo equivale ao
+        # created_at BETWEEN 'início' AND 'fim' da tabela
+        intervalo = banco.obter_estatisticas('2026-01-01', '2026-01-03')
+        assert intervalo == banco.obter_estatisticas('2026-01-01 00:00:00', '2026-01-03')
+        assert intervalo['total_agendamentos'] == 2
+
+        vazio = banco.obter_estatisticas('2030-01-01', '2030-12-31')
+        assert vazio['total_agendamentos'] == 0 and vazio['taxa_cancelamento'] == 0
+
+        # Banco anterior ao resumo: init_database o preenche com o histórico
+        with banco.get_write_connection() as conn:
+            conn.execute('DROP TABLE estatisticas_diarias')
+            for operacao in ('insert', 'update', 'delete'):
+                conn.execute(f'DROP TRIGGER trg_estatisticas_{operacao}')
+        banco.init_database()
+        assert banco.obter_estatisticas() == tudo
+        assert banco.obter_estatisticas('2026-01-01', '2026-01-03') == intervalo
+
+
+def test_reservar():
+    with banco_privado() as banco:
+        telefone = '16988880000'
+
+        agendamento, erro = banco.reservar(novo_agendamento(telefone=telefone, horario='09:00'))
+        assert erro is None and agendamento['status'] == 'confirmado'
+        assert agendamento['telefone'] == telefone
+
+        # Mesmo horário já confirmado: nada é gravado
+        agendamento, erro = banco.reservar(novo_agendamento(horario='09:00'))
+        assert agendamento is None and erro == 'Horário indisponível'
+
+        # Limite de agendamentos futuros por telefone
+        assert banco.reservar(novo_agendamento(telefone=telefone, horario='10:00'), 2)[1] is None
+        agendamento, erro = banco.reservar(novo_agendamento(telefone=telefone, horario='11:00'), 2)
+        assert agendamento is None and 'Limite' in erro
+        assert banco.contar_agendamentos_futuros_por_telefone(telefone) == 2
+
+        # Horário cancelado volta a ficar livre
+        primeiro = banco.buscar_agendamentos_por_telefone(telefone)[0]
+        banco.cancelar_agendamento(primeiro['id'])
+        assert banco.reservar(novo_agendamento(horario=primeiro['horario']))[1] is None
+
+
+def test_criar_agendamentos_em_lote():
+    with banco_privado() as banco:
+        lote = [novo_agendamento(data='2030-01-08', horario=h)
+                for h in ('09:00', '09:30', '10:00')]
+
+        assert banco.criar_agendamentos_em_lote(lote) == 3
+        assert banco.obter_horarios_ocupados('2030-01-08') == {'09:00', '09:30', '10:00'}
+        assert banco.obter_estatisticas()['total_agendamentos'] == 3
+
+        # Um número de confirmação repetido desfaz o lote inteiro
+        repetido = novo_agendamento(data='2030-01-09')
+        try:
+            banco.criar_agendamentos_em_lote([repetido, dict(repetido, horario='10:00')])
+        except sqlite3.IntegrityError:
+            pass
+        else:
+            raise AssertionError('lote com número de confirmação repetido foi aceito')
+        assert banco.buscar_agendamentos_por_data('2030-01-09') == []
+
+
+def test_cancelar_agendamento():
+    with banco_privado() as banco:
+        criado = banco.criar_agendamento(novo_agendamento(data='2030-01-10', horario='15:00'))
+
+        cancelado = banco.cancelar_agendamento(criado['id'], 'cliente desistiu')
+        assert cancelado == {
+            'id': criado['id'],
+            'nome': criado['nome'],
+            'telefone': criado['telefone'],
+            'data': '2030-01-10',
+            'horario': '15:00',
+        }
+        assert banco.verificar_disponibilidade('2030-01-10', '15:00')
+
+        # Já cancelado ou inexistente: nada a devolver
+        assert banco.cancelar_agendamento(criado['id']) is None
+        assert banco.cancelar_agendamento(criado['id'] + 1000) is None
+
+        with banco.get_read_connection() as conn:
+            status, motivo = conn.execute(
+                'SELECT status, motivo_cancelamento FROM agendamentos WHERE id = ?',
+                (criado['id'],)
+            ).fetchone()
+        assert (status, motivo) == ('cancelado', 'cliente desistiu')
+
+
 if __name__ == '__main__':
-    test_database()
\ No newline at end of file
+    for nome, teste in list(globals().items()):
+        if nome.startswith('test_'):
+            teste()